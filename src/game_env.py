@@ -1,16 +1,19 @@
 import os
 import logging
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-from jericho import FrotzEnv, DictionaryWord
-from .exceptions import GameNotFoundError, GameLoadError, InvalidActionError
+from .exceptions import GameError, GameNotFoundError, GameLoadError, InvalidActionError
+
+if TYPE_CHECKING:
+    from jericho import DictionaryWord
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class GameState:
     """Represents the current state of the game."""
     observation: str
@@ -22,37 +25,69 @@ class GameState:
     inventory: list[str]
     location: str
     state_hash: Optional[str] = None
+    # True if state_hash had already been reached earlier in this game.
+    revisited: bool = False
+
+
+_DEFAULT_GAMES_DIR = Path(__file__).parent.parent / "games" / "jericho-game-suite"
 
 
 def get_default_games_dir() -> Path:
     """Get the default directory containing game files."""
-    project_root = Path(__file__).parent.parent
-    default_path = project_root / "games" / "jericho-game-suite"
-    print(default_path)
-    return default_path
+    return _DEFAULT_GAMES_DIR
 
 
-def discover_games(games_dir: Optional[Path] = None) -> dict[str, Path]:
-    """Discover all available Z-machine games in the games directory."""
-    if games_dir is None:
-        games_dir = get_default_games_dir()
-
-    games_dir = Path(games_dir)
-    if not games_dir.exists():
-        return {}
+@lru_cache(maxsize=8)
+def _scan_games_dir(games_dir: Path, mtime: float) -> tuple[tuple[str, Path], ...]:
+    """
+    Glob the games directory for Z-machine story files.
 
+    Cached per (directory, mtime): adding or removing a file bumps the
+    directory mtime, so the next lookup rescans.
+    """
     games = {}
     for ext in ["*.z3", "*.z4", "*.z5", "*.z8"]:
         for game_path in games_dir.glob(ext):
             game_name = game_path.stem.lower()
             games[game_name] = game_path
 
-    return dict(sorted(games.items()))
+    return tuple(sorted(games.items()))
+
+
+@lru_cache(maxsize=8)
+def _game_names(games_dir: Path, mtime: float) -> tuple[str, ...]:
+    """Sorted game names from the cached scan of the same directory state."""
+    return tuple(name for name, _ in _scan_games_dir(games_dir, mtime))
+
+
+def _games_dir_mtime(games_dir: Optional[Path]) -> tuple[Path, Optional[float]]:
+    """Resolve the games directory and its mtime (None if it does not exist)."""
+    games_dir = Path(games_dir) if games_dir is not None else get_default_games_dir()
+    try:
+        return games_dir, games_dir.stat().st_mtime
+    except OSError:
+        return games_dir, None
+
+
+def discover_games(games_dir: Optional[Path] = None) -> dict[str, Path]:
+    """Discover all available Z-machine games in the games directory."""
+    games_dir, mtime = _games_dir_mtime(games_dir)
+    if mtime is None:
+        return {}
+    return dict(_scan_games_dir(games_dir, mtime))
+
+
+def available_game_names(games_dir: Optional[Path] = None) -> tuple[str, ...]:
+    """Return the sorted game names as a cached tuple shared between callers."""
+    games_dir, mtime = _games_dir_mtime(games_dir)
+    if mtime is None:
+        return ()
+    return _game_names(games_dir, mtime)
 
 
 def list_available_games(games_dir: Optional[Path] = None) -> list[str]:
     """Return a sorted list of available game names."""
-    return list(discover_games(games_dir).keys())
+    return list(available_game_names(games_dir))
 
 
 class TextAdventureEnv:
@@ -100,6 +135,10 @@ class TextAdventureEnv:
             game_path = available_games[game.lower()]
             self.game = game.lower()
 
+        # Imported here rather than at module level: jericho pulls in spacy and
+        # numpy, which game discovery and server start-up never need.
+        from jericho import FrotzEnv
+
         try:
             self.env = FrotzEnv(str(game_path))
         except Exception as e:
@@ -109,6 +148,9 @@ class TextAdventureEnv:
         self._last_score = 0
         self._history: list[tuple[str, str]] = []
         self._state_hashes: set[str] = set()
+        # Static per story file; fetched from the engine on first use.
+        self._max_score: Optional[int] = None
+        self._dictionary: Optional[list["DictionaryWord"]] = None
 
         try:
             import jericho
@@ -121,6 +163,13 @@ class TextAdventureEnv:
     def __repr__(self) -> str:
         return f"TextAdventureEnv(game='{self.game}', path={self.game_path})"
 
+    def close(self) -> None:
+        """Shut down the underlying Frotz interpreter and free its memory."""
+        try:
+            self.env.close()
+        except Exception as e:
+            logger.debug(f"Could not close environment: {e}")
+
     def reset(self) -> GameState:
         """Reset the game to the beginning."""
         try:
@@ -185,18 +234,23 @@ class TextAdventureEnv:
             logger.debug(f"Could not get location: {e}")
             location = "Unknown"
 
+        revisited = False
         try:
             state_hash = self.env.get_world_state_hash()
+            # Check before recording, or every state would count as already seen.
+            revisited = state_hash in self._state_hashes
             self._state_hashes.add(state_hash)
         except Exception as e:
             logger.debug(f"Could not get state hash: {e}")
             state_hash = None
 
-        try:
-            max_score = self.env.get_max_score()
-        except Exception as e:
-            logger.debug(f"Could not get max score: {e}")
-            max_score = 0
+        max_score = self._max_score
+        if max_score is None:
+            try:
+                max_score = self._max_score = self.env.get_max_score()
+            except Exception as e:
+                logger.debug(f"Could not get max score: {e}")
+                max_score = 0
 
         return GameState(
             observation=observation,
@@ -208,19 +262,35 @@ class TextAdventureEnv:
             inventory=inventory,
             location=location,
             state_hash=state_hash,
+            revisited=revisited,
         )
 
     def get_history(self) -> list[tuple[str, str]]:
         """Return a copy of the (action, observation) history."""
         return self._history.copy()
 
+    def get_history_tail(self, count: int) -> list[tuple[str, str]]:
+        """Return the last `count` history entries (the full history if count <= 0)."""
+        if count <= 0:
+            return self._history.copy()
+        return self._history[-count:]
+
+    def get_history_length(self) -> int:
+        """Number of actions taken since the last reset."""
+        return len(self._history)
+
     def get_valid_actions(self) -> list[str]:
-        """Get valid actions for the current state via Jericho's action analysis."""
+        """
+        Get valid actions for the current state via Jericho's action analysis.
+
+        Raises GameError if the analysis fails, so callers can tell a real
+        result from a failure (and avoid caching the latter).
+        """
         try:
             return self.env.get_valid_actions()
         except Exception as e:
-            logger.warning(f"Could not get valid actions: {e}. Returning minimal fallback.")
-            return ["look", "inventory", "wait"]
+            logger.warning(f"Could not get valid actions: {e}")
+            raise GameError(f"Could not get valid actions: {e}") from e
 
     def _zobject_to_dict(self, obj) -> dict:
         """Convert a ZObject to a serialisable dictionary."""
@@ -241,7 +311,9 @@ class TextAdventureEnv:
         Get objects in the current or specified location.
 
         Walks the ZObject child/sibling chain starting from the location object.
-        If location_name is None, uses the player's current location.
+        If location_name is None, uses the player's current location. Raises
+        GameError if the engine fails part-way, rather than returning a partial
+        or empty list that would look like a real answer.
         """
         try:
             if location_name is None:
@@ -259,22 +331,19 @@ class TextAdventureEnv:
 
             # Walk child → sibling chain to enumerate direct children
             result = []
-            try:
-                child_num = location_obj.child
-                if child_num:
-                    child = self.env.get_object(child_num)
-                    while child is not None:
-                        result.append(self._zobject_to_dict(child))
-                        sibling_num = getattr(child, "sibling", None)
-                        child = self.env.get_object(sibling_num) if sibling_num else None
-            except Exception as e:
-                logger.debug(f"Error walking child/sibling chain: {e}")
+            child_num = location_obj.child
+            if child_num:
+                child = self.env.get_object(child_num)
+                while child is not None:
+                    result.append(self._zobject_to_dict(child))
+                    sibling_num = getattr(child, "sibling", None)
+                    child = self.env.get_object(sibling_num) if sibling_num else None
 
             return result
 
         except Exception as e:
             logger.warning(f"Could not get objects in location: {e}")
-            return []
+            raise GameError(f"Could not get objects in location: {e}") from e
 
     def get_world_state_hash(self) -> Optional[str]:
         """Get MD5 hash of the current clean world object tree."""
@@ -294,13 +363,21 @@ class TextAdventureEnv:
         """Number of unique game states visited this session."""
         return len(self._state_hashes)
 
-    def get_game_dictionary(self) -> list[DictionaryWord]:
-        """Return all DictionaryWord objects recognised by this game's parser."""
-        try:
-            return self.env.get_dictionary()
-        except Exception as e:
-            logger.warning(f"Could not get game dictionary: {e}")
-            return []
+    def get_game_dictionary(self) -> list["DictionaryWord"]:
+        """
+        Return all DictionaryWord objects recognised by this game's parser.
+
+        The dictionary is fixed by the story file, so it is read from the
+        engine once and the same list is returned on later calls. A failed
+        read raises GameError and is retried on the next call.
+        """
+        if self._dictionary is None:
+            try:
+                self._dictionary = self.env.get_dictionary()
+            except Exception as e:
+                logger.warning(f"Could not get game dictionary: {e}")
+                raise GameError(f"Could not get game dictionary: {e}") from e
+        return self._dictionary
 
 
 
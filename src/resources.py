@@ -47,6 +47,7 @@ HOW_TO_PLAY = """
 
 ## Useful Tools
 - `available_actions()` — guaranteed valid commands right now
+- `batch_action(commands)` — run several known moves in one call (stops on game over)
 - `look_around()` — reveals items the narrative may not mention
 - `explore_map()` — world layout from the engine
 - `recent_history()` — review past actions to avoid repeating failures
@@ -1,9 +1,14 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import orjson
 from fastmcp import FastMCP
 from starlette.responses import JSONResponse
 from starlette.requests import Request
 
-from .game_env import list_available_games
-from .session import SingleGameSession, _format_state
+from .game_env import available_game_names
+from .session import SingleGameSession, _classify_vocabulary, _pct
 from .resources import HOW_TO_PLAY, GUIDE_COMMANDS
 
 app = FastMCP(
@@ -17,19 +22,112 @@ app = FastMCP(
 
 _game_session = SingleGameSession()
 
+# Shared rejection body for tools called before start_game(); FastMCP only reads it.
+_NO_ACTIVE_GAME = {"error": "No active game.", "hint": "Call start_game() first."}
+_NO_STATE = {"error": "No state available. Try calling start_game() again."}
+
+# Jericho calls are blocking C code and FrotzEnv is not safe to use from several
+# threads at once, so they all run on one dedicated worker: engine calls stay
+# serialised while the event loop keeps serving other requests.
+_engine_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="jericho")
+
+
+async def _run_engine(fn, *args):
+    """Run a blocking Jericho call on the engine thread."""
+    return await asyncio.get_running_loop().run_in_executor(_engine_executor, fn, *args)
+
+
+def _requires_active_game(fn):
+    """
+    Run a tool body under the session lock, rejecting calls made before
+    start_game() with _NO_ACTIVE_GAME. functools.wraps keeps the original
+    signature and docstring visible to FastMCP's schema generation.
+
+    The body is shielded from cancellation: the engine worker finishes a call
+    even if the request goes away, so the tool must finish too and record the
+    result, or the session would describe a state the engine has left.
+    """
+    async def locked(*args, **kwargs):
+        async with _game_session.lock:
+            if not _game_session.is_active():
+                return _NO_ACTIVE_GAME
+            return await fn(*args, **kwargs)
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        return await asyncio.shield(locked(*args, **kwargs))
+    return wrapper
+
+
+class ORJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson instead of the stdlib encoder."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+# Rendered once; Starlette responses hold their encoded body and can be sent repeatedly.
+_INACTIVE_STATUS = ORJSONResponse({"active": False, "message": "No game currently active"})
+
+# Last rendered /health and /status responses, keyed by route, with the session epoch
+# they were built at. Monitoring polls reuse them until the session changes.
+_route_cache: dict[str, tuple[int, JSONResponse]] = {}
+
+
+_MAX_BATCH_STEPS = 100
+
+_GAMES_SAMPLE_SIZE = 20
+
+_TRUNCATED_SUFFIX = "..."
+
+# Safe commands suggested when the engine cannot analyse valid actions.
+_ACTIONS_FALLBACK = ("look", "inventory", "wait")
+
+# Curated list_games() picks; static, so shared by every response.
+_RECOMMENDED_GAMES = {
+    "classic_series": ("zork1", "zork2", "zork3"),
+    "shorter_games":  ("detective", "advent"),
+    "other_popular":  ("lgop", "hitchhiker"),
+}
+
+_INACTIVE_GAME_INFO = {
+    "active": False,
+    "message": "No game is currently running.",
+    "hint": "Call start_game(game_name) to begin.",
+}
+
+
+def _truncate(text: str, limit: int = 200) -> str:
+    """Cut text to `limit` characters plus a suffix; shorter text is returned as-is."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + _TRUNCATED_SUFFIX
+
+
 _MILESTONES = [25, 50, 75, 100]
-_reached_milestones: set[int] = set()
+# One bit per entry of _MILESTONES; a set bit means that milestone was already reported.
+_MILESTONE_BITS = [(m, 1 << i) for i, m in enumerate(_MILESTONES)]
+_reached_milestones = 0
+
+# Fixed per-move messages, built once rather than formatted on every step.
+_MILESTONE_MESSAGES = {m: f"🏆 Milestone reached: {m}% completion!" for m in _MILESTONES}
+_REVISIT_WARNING = (
+    "⚠ You have returned to a previously visited state — "
+    "you may be going in circles. Consider a different approach."
+)
 
 
 def _check_milestones(score: int, max_score: int) -> list[int]:
     """Return any newly crossed milestone percentages."""
+    global _reached_milestones
+
     if not max_score:
         return []
-    current_pct = (score / max_score) * 100
+    current_pct = score * 100 // max_score
     newly_reached = []
-    for m in _MILESTONES:
-        if current_pct >= m and m not in _reached_milestones:
-            _reached_milestones.add(m)
+    for m, bit in _MILESTONE_BITS:
+        if current_pct >= m and not _reached_milestones & bit:
+            _reached_milestones |= bit
             newly_reached.append(m)
     return newly_reached
 
@@ -57,39 +155,24 @@ def guide_commands() -> str:
 def game_info() -> dict:
     """
     Live metadata about the currently loaded game session.
-    Returns game name, score, moves, inventory, location, and session status.
+    Returns game name, score, progress, moves, inventory, location, the latest
+    observation, and session status.
     Read this at any point to orient yourself without consuming a move.
     """
     if not _game_session.is_active():
         return {
-            "active": False,
-            "message": "No game is currently running.",
-            "available_games_sample": list_available_games()[:20],
-            "hint": "Call start_game(game_name) to begin.",
+            **_INACTIVE_GAME_INFO,
+            "available_games_sample": available_game_names()[:_GAMES_SAMPLE_SIZE],
         }
 
-    state = _game_session.current_state
-    score    = state.score     if state else 0
-    max_score = state.max_score if state else 0
-    moves    = state.moves     if state else 0
-    progress_pct = round((score / max_score) * 100) if max_score else 0
-
-    return {
-        "active": True,
-        "game": _game_session.game_name,
-        "score": score,
-        "max_score": max_score,
-        "progress": f"{score}/{max_score} ({progress_pct}%)",
-        "moves": moves,
-        "done": state.done if state else False,
-        "inventory": state.inventory if state else [],
-        "location": state.location if state else "Unknown",
-        "started_at": _game_session.started_at.isoformat() if _game_session.started_at else None,
-    }
+    info = {"active": True, "game": _game_session.game_name}
+    info.update(_game_session.formatted_state())
+    info["started_at"] = _game_session.started_at_iso
+    return info
 
 
 @app.tool
-def start_game(game_name: str = "zork1") -> dict:
+async def start_game(game_name: str = "zork1") -> dict:
     """
     Start a new game. Replaces any currently running session.
 
@@ -113,27 +196,98 @@ def start_game(game_name: str = "zork1") -> dict:
         observation, score, max_score, moves, done, reward,
         inventory, location, progress, game, message
     """
-    global _reached_milestones
-    _reached_milestones = set()
+    async def start() -> dict:
+        global _reached_milestones
+
+        try:
+            async with _game_session.lock:
+                previous = _game_session.env
+                # Load on the engine worker, then swap the session over here on the
+                # event loop so /health and /status never see a half-started game.
+                env, state = await _run_engine(_game_session.load_game, game_name)
+                _game_session.begin_game(game_name, env, state)
+                _reached_milestones = 0
+                response = _game_session.formatted_state()
+        except Exception as e:
+            return {
+                "error": f"Failed to start game: {str(e)}",
+                "hint": "Call list_games() to see valid game names.",
+            }
+
+        # Free the replaced interpreter on the engine thread, as end_game() does.
+        if previous is not None and previous is not env:
+            _engine_executor.submit(previous.close)
 
-    try:
-        state = _game_session.start_new_game(game_name)
-        response = _format_state(state)
         response["game"] = game_name
         response["message"] = (
             f"'{game_name}' loaded. Max score: {state.max_score}. "
             "Read 'guide://how-to-play' if this is your first game."
         )
         return response
+
+    # The engine worker finishes a load even if this request is cancelled, so the
+    # swap is shielded too: the new game is always installed (and the old one
+    # closed) rather than left loaded but unreachable.
+    return await asyncio.shield(start())
+
+
+async def _do_step(command: str) -> dict:
+    """
+    Advance the game by one command and build the action() response.
+
+    Callers must hold the session lock and have checked the session is active.
+    """
+    env = _game_session.env
+    try:
+        state = await _run_engine(env.step, command)  # type: ignore
     except Exception as e:
         return {
-            "error": f"Failed to start game: {str(e)}",
-            "hint": "Call list_games() to see valid game names.",
+            "error": f"Engine error: {str(e)}",
+            "hint": "This is an unexpected engine failure. Try calling start_game() to reset.",
         }
 
+    _game_session.update_state(state)
+    response = _game_session.formatted_state()
+
+    revisited = state.revisited
+    response["revisited_state"] = revisited
+
+    score, max_score, reward = state.score, state.max_score, state.reward
+    newly_crossed = _check_milestones(score, max_score)
+    response["milestones_reached"] = newly_crossed
+
+    # Most moves are quiet (no reward, no revisit, no milestone): skip building
+    # a message list for them entirely.
+    if not (state.done or reward or revisited or newly_crossed):
+        return response
+
+    messages = []
+
+    if state.done:
+        if score >= (max_score or 1):
+            messages.append(f"You WON! Final score: {score}/{max_score}.")
+        else:
+            messages.append(
+                f"Game over. Score: {score}/{max_score}. "
+                "Call start_game() to try again."
+            )
+    elif reward > 0:
+        messages.append(f"+{reward} points. Score: {score}/{max_score}.")
+    elif reward < 0:
+        messages.append(f"{reward} points. Score: {score}/{max_score}.")
+
+    if revisited:
+        messages.append(_REVISIT_WARNING)
+
+    messages.extend(_MILESTONE_MESSAGES[m] for m in newly_crossed)
+
+    response["message"] = " | ".join(messages)
+    return response
+
 
 @app.tool
-def action(command: str) -> dict:
+@_requires_active_game
+async def action(command: str) -> dict:
     """
     Send a command to the game. Primary interaction tool — one call = one move.
 
@@ -161,59 +315,79 @@ def action(command: str) -> dict:
         milestones_reached: List of completion % milestones newly crossed this turn (e.g. [25, 50])
         message: Present when reward != 0, the game ends, or a milestone is crossed
     """
-    if not _game_session.is_active():
-        return {"error": "No active game.", "hint": "Call start_game() first."}
-
-    try:
-        state = _game_session.env.step(command)  # type: ignore
-    except Exception as e:
-        return {
-            "error": f"Engine error: {str(e)}",
-            "hint": "This is an unexpected engine failure. Try calling start_game() to reset.",
-        }
-
-    _game_session.current_state = state
-    response = _format_state(state)
-
-    state_hash = state.state_hash
-    revisited = _game_session.env.is_state_visited(state_hash) if state_hash else False #type: ignore
-    response["revisited_state"] = revisited
+    return await _do_step(command)
 
-    newly_crossed = _check_milestones(state.score, state.max_score)
-    response["milestones_reached"] = newly_crossed
 
-    messages = []
+@app.tool
+@_requires_active_game
+async def batch_action(
+    commands: list[str],
+    stop_on_done: bool = True,
+    stop_on_negative_reward: bool = False,
+    max_steps: int = _MAX_BATCH_STEPS,
+) -> dict:
+    """
+    Send several commands in one call. Each command is one move, run in order.
 
-    if state.done:
-        if state.score >= (state.max_score or 1):
-            messages.append(f"You WON! Final score: {state.score}/{state.max_score}.")
-        else:
-            messages.append(
-                f"Game over. Score: {state.score}/{state.max_score}. "
-                "Call start_game() to try again."
-            )
-    elif state.reward > 0:
-        messages.append(f"+{state.reward} points. Score: {state.score}/{state.max_score}.")
-    elif state.reward < 0:
-        messages.append(f"{state.reward} points. Score: {state.score}/{state.max_score}.")
+    When to call this:
+        - When you already know a sequence of moves, e.g. walking a known route
+          ('north', 'north', 'east') or replaying steps after a restart.
+        - When round-trips are slowing you down and the next moves don't depend on
+          reading each observation first.
 
-    if revisited:
-        messages.append(
-            "⚠ You have returned to a previously visited state — "
-            "you may be going in circles. Consider a different approach."
-        )
+    How to use it:
+        Pass the commands in the order they should run. Each entry in results is exactly
+        what action() would have returned for that command. By default the batch stops
+        early when the game ends; set stop_on_negative_reward to also stop on the first
+        move that loses points. It always stops on an engine error. Read stopped_reason
+        and the last result before deciding what to do next.
 
-    for m in newly_crossed:
-        messages.append(f"🏆 Milestone reached: {m}% completion!")
+    Args:
+        commands: Commands to run in order (e.g. ['open mailbox', 'take leaflet']).
+        stop_on_done: Stop after a move that ends the game (default: True).
+        stop_on_negative_reward: Stop after a move with reward < 0 (default: False).
+        max_steps: Maximum commands to run from this batch (capped at 100).
 
-    if messages:
-        response["message"] = " | ".join(messages)
+    Returns:
+        results: One action()-style response per executed move, each with its command
+        steps_executed: Number of moves actually run
+        stopped_reason: 'completed', 'done', 'negative_reward', 'error' or 'max_steps'
+        final_state: observation, score, max_score, moves, done, reward,
+                     inventory, location, progress after the last move
+    """
+    limit = max(0, min(max_steps, _MAX_BATCH_STEPS))
+    results = []
+    stopped_reason = "completed"
+
+    for command in commands[:limit]:
+        response = await _do_step(command)
+        response["command"] = command
+        results.append(response)
+
+        if "error" in response:
+            stopped_reason = "error"
+            break
+        if stop_on_done and response["done"]:
+            stopped_reason = "done"
+            break
+        if stop_on_negative_reward and response["reward"] < 0:
+            stopped_reason = "negative_reward"
+            break
+    else:
+        if len(commands) > limit:
+            stopped_reason = "max_steps"
 
-    return response
+    return {
+        "results": results,
+        "steps_executed": len(results),
+        "stopped_reason": stopped_reason,
+        "final_state": _game_session.formatted_state(),
+    }
 
 
 @app.tool
-def current_state() -> dict:
+@_requires_active_game
+async def current_state() -> dict:
     """
     Return current game state without advancing the turn counter.
 
@@ -227,19 +401,17 @@ def current_state() -> dict:
         observation, score, max_score, moves, done, reward,
         inventory, location, progress, game
     """
-    if not _game_session.is_active():
-        return {"error": "No active game.", "hint": "Call start_game() first."}
-
     if not _game_session.current_state:
-        return {"error": "No state available. Try calling start_game() again."}
+        return _NO_STATE
 
-    response = _format_state(_game_session.current_state)
+    response = _game_session.formatted_state()
     response["game"] = _game_session.game_name
     return response
 
 
 @app.tool
-def available_actions() -> dict:
+@_requires_active_game
+async def available_actions() -> dict:
     """
     Return all valid actions for the current game state.
 
@@ -259,18 +431,19 @@ def available_actions() -> dict:
         actions: All command strings valid in the current state
         count: Number of actions returned
     """
-    if not _game_session.is_active():
-        return {"error": "No active game.", "hint": "Call start_game() first."}
-
     try:
-        all_actions = _game_session.env.get_valid_actions()  # type: ignore
+        all_actions = _game_session.get_cached_valid_actions()
+        if all_actions is None:
+            all_actions = await _run_engine(_game_session.env.get_valid_actions)  # type: ignore
+            _game_session.cache_valid_actions(all_actions)
         return {"actions": all_actions, "count": len(all_actions)}
     except Exception as e:
-        return {"error": str(e), "fallback": ["look", "inventory", "wait"]}
+        return {"error": str(e), "fallback": _ACTIONS_FALLBACK}
 
 
 @app.tool
-def look_around() -> dict:
+@_requires_active_game
+async def look_around() -> dict:
     """
     Inspect objects in the current location via the internal Z-machine object tree.
 
@@ -293,25 +466,30 @@ def look_around() -> dict:
         current_location_objects: Objects here (name, num, parent, child, sibling)
         object_count_here: Number of objects in this room
     """
-    if not _game_session.is_active():
-        return {"error": "No active game.", "hint": "Call start_game() first."}
+    cached = _game_session.derived.get("look_around")
+    if cached is not None:
+        return cached
 
     try:
-        current_objects = _game_session.env.get_objects_in_location(None)  # type: ignore
-        location_obj = _game_session.env.env.get_player_location()  # type: ignore
+        env = _game_session.env
+        current_objects = await _run_engine(env.get_objects_in_location, None)  # type: ignore
+        location_obj = await _run_engine(env.env.get_player_location)  # type: ignore
         location_name = str(location_obj) if location_obj else "Unknown"
 
-        return {
+        result = {
             "location_name": location_name,
             "current_location_objects": current_objects,
             "object_count_here": len(current_objects),
         }
+        _game_session.derived["look_around"] = result
+        return result
     except Exception as e:
         return {"error": str(e)}
 
 
 @app.tool
-def recent_history(count: int = 5) -> dict:
+@_requires_active_game
+async def recent_history(count: int = 5) -> dict:
     """
     Return recent action/observation pairs from this session.
 
@@ -330,21 +508,19 @@ def recent_history(count: int = 5) -> dict:
         showing: Number of entries returned
         total_moves: Total moves taken this session
     """
-    if not _game_session.is_active():
-        return {"error": "No active game.", "hint": "Call start_game() first."}
-
     try:
-        history = _game_session.env.get_history()  # type: ignore
-        total = len(history)
-        recent = history[-count:] if count > 0 else history
+        env = _game_session.env
+        total = env.get_history_length()  # type: ignore
+        recent = env.get_history_tail(count)  # type: ignore
 
+        first_turn = total - len(recent) + 1
         formatted = [
             {
-                "turn": total - len(recent) + i + 1,
+                "turn": turn,
                 "action": act,
-                "result": obs[:200] + "..." if len(obs) > 200 else obs,
+                "result": _truncate(obs),
             }
-            for i, (act, obs) in enumerate(recent)
+            for turn, (act, obs) in enumerate(recent, start=first_turn)
         ]
 
         return {
@@ -382,23 +558,20 @@ def list_games(limit: int = 10) -> dict:
         showing: How many are in this response
         recommended: Curated picks by category
     """
-    all_games = list_available_games()
+    all_games = available_game_names()
     games = all_games[:limit] if limit > 0 else all_games
 
     return {
         "games": games,
         "total_available": len(all_games),
         "showing": len(games),
-        "recommended": {
-            "classic_series": ["zork1", "zork2", "zork3"],
-            "shorter_games":  ["detective", "advent"],
-            "other_popular":  ["lgop", "hitchhiker"],
-        },
+        "recommended": _RECOMMENDED_GAMES,
     }
 
 
 @app.tool
-def game_vocabulary() -> dict:
+@_requires_active_game
+async def game_vocabulary() -> dict:
     """
     Return all words the game's parser recognises, grouped by part of speech.
 
@@ -421,32 +594,17 @@ def game_vocabulary() -> dict:
         total_words: Full vocabulary size
         verbs, nouns, adjectives, directions, prepositions, meta, special, unclassified
     """
-    if not _game_session.is_active():
-        return {"error": "No active game.", "hint": "Call start_game() first."}
-
     try:
-        vocab = _game_session.env.get_game_dictionary()  # type: ignore
-
-        return {
-            "total_words":  len(vocab),
-            "verbs":        [str(w) for w in vocab if w.is_verb],
-            "nouns":        [str(w) for w in vocab if w.is_noun],
-            "adjectives":   [str(w) for w in vocab if w.is_adj],
-            "directions":   [str(w) for w in vocab if w.is_dir],
-            "prepositions": [str(w) for w in vocab if w.is_prep],
-            "meta":         [str(w) for w in vocab if w.is_meta],
-            "special":      [str(w) for w in vocab if w.is_special],
-            "unclassified": [str(w) for w in vocab if not any([
-                w.is_verb, w.is_noun, w.is_adj, w.is_dir,
-                w.is_prep, w.is_meta, w.is_special,
-            ])],
-        }
+        if _game_session.vocabulary is None:
+            vocab = await _run_engine(_game_session.env.get_game_dictionary)  # type: ignore
+            _game_session.vocabulary = _classify_vocabulary(vocab)
+        return _game_session.vocabulary
     except Exception as e:
         return {"error": str(e)}
 
 
 @app.tool
-def end_game() -> dict:
+async def end_game() -> dict:
     """
     End the current session and release resources.
 
@@ -467,18 +625,24 @@ def end_game() -> dict:
     """
     global _reached_milestones
 
-    if not _game_session.is_active():
-        return {"message": "No active game running."}
+    # Wait for any in-flight engine call so it can't write into a cleared session.
+    async with _game_session.lock:
+        if not _game_session.is_active():
+            return {"message": "No active game running."}
+
+        game_name   = _game_session.game_name
+        state       = _game_session.current_state
+        env         = _game_session.env
+        _game_session.clear()
+        _reached_milestones = 0
+
+    # Free the interpreter on the engine thread; the summary doesn't wait for it.
+    _engine_executor.submit(env.close)  # type: ignore
 
-    game_name   = _game_session.game_name
-    state       = _game_session.current_state
     final_score = state.score     if state else 0
     max_score   = state.max_score if state else 0
     total_moves = state.moves     if state else 0
-    performance = f"{round((final_score / max_score) * 100)}%" if max_score else "N/A"
-
-    _game_session.clear()
-    _reached_milestones = set()
+    performance = f"{_pct(final_score, max_score)}%" if max_score else "N/A"
 
     return {
         "message":     f"Session ended: {game_name}",
@@ -491,26 +655,42 @@ def end_game() -> dict:
 
 @app.custom_route("/health", methods=["GET"])
 async def health_check(request: Request) -> JSONResponse:
-    return JSONResponse({
+    # Read the epoch before the session fields: a change in between then bumps
+    # the epoch past the cached entry instead of hiding behind it.
+    epoch = _game_session.epoch
+    cached = _route_cache.get("health")
+    if cached is not None and cached[0] == epoch:
+        return cached[1]
+
+    response = ORJSONResponse({
         "status": "healthy",
         "service": "jericho-text-adventure-server",
         "game_active": _game_session.is_active(),
         "current_game": _game_session.game_name if _game_session.is_active() else None,
     })
+    _route_cache["health"] = (epoch, response)
+    return response
 
 
 @app.custom_route("/status", methods=["GET"])
 async def game_status(request: Request) -> JSONResponse:
+    epoch = _game_session.epoch
     if not _game_session.is_active():
-        return JSONResponse({"active": False, "message": "No game currently active"})
+        return _INACTIVE_STATUS
+
+    cached = _route_cache.get("status")
+    if cached is not None and cached[0] == epoch:
+        return cached[1]
 
     state = _game_session.current_state
-    return JSONResponse({
+    response = ORJSONResponse({
         "active":      True,
         "game":        _game_session.game_name,
         "score":       state.score      if state else 0,
         "max_score":   state.max_score  if state else 0,
         "moves":       state.moves      if state else 0,
         "done":        state.done       if state else False,
-        "started_at":  _game_session.started_at.isoformat() if _game_session.started_at else None,
-    })
\ No newline at end of file
+        "started_at":  _game_session.started_at_iso,
+    })
+    _route_cache["status"] = (epoch, response)
+    return response
@@ -1,55 +1,187 @@
+import asyncio
+import operator
+from collections import OrderedDict
 from .game_env import TextAdventureEnv, GameState
 from typing import Optional
 from datetime import datetime
 
+# Distinct world states whose valid-action lists are kept per session.
+_VALID_ACTIONS_CACHE_SIZE = 256
+
 
 class SingleGameSession:
     """Manages a single active game session."""
 
+    __slots__ = (
+        "env", "game_name", "current_state", "started_at", "started_at_iso", "lock",
+        "vocabulary", "derived", "epoch", "_valid_actions", "_formatted",
+    )
+
     def __init__(self):
         self.env: Optional[TextAdventureEnv] = None
         self.game_name: Optional[str] = None
         self.current_state: Optional[GameState] = None
         self.started_at: Optional[datetime] = None
+        self.started_at_iso: Optional[str] = None
+        # Held by tools across engine calls so concurrent requests can't interleave
+        # a step with a restart or end_game on the shared environment.
+        self.lock = asyncio.Lock()
+        # Classified parser vocabulary for the loaded game, built on first request.
+        self.vocabulary: Optional[dict] = None
+        # Tool results derived from current_state, dropped whenever the state changes.
+        self.derived: dict[str, dict] = {}
+        # Bumped on every change to the session's state so readers can key caches on it.
+        self.epoch = 0
+        # Valid actions by world-state hash, least recently used first.
+        self._valid_actions: OrderedDict[str, list[str]] = OrderedDict()
+        self._formatted: Optional[dict] = None
 
     def is_active(self) -> bool:
         return self.env is not None
 
-    def start_new_game(self, game_name: str) -> GameState:
-        """Start a new game, replacing any existing session."""
-        if self.env is not None:
-            self.clear()
-        self.env = TextAdventureEnv(game_name)
+    def load_game(self, game_name: str) -> tuple[TextAdventureEnv, GameState]:
+        """
+        Load (or reuse) and reset the interpreter for a new game.
+
+        Restarting the game that is already loaded reuses its interpreter and
+        only resets it, skipping the story-file load. Leaves the session's fields
+        untouched, so it can run on the engine worker while readers on the event
+        loop keep seeing the previous game; install the result with begin_game().
+        If a different story file fails to load, the previous game is left running.
+        The previous interpreter is not closed here: it is still the session's
+        env until begin_game() replaces it, so the caller closes it after that.
+        """
+        env = self.env
+        if env is not None and env.game == game_name.lower():
+            return env, env.reset()
+        new_env = TextAdventureEnv(game_name)
+        try:
+            state = new_env.reset()
+        except Exception:
+            new_env.close()
+            raise
+        return new_env, state
+
+    def begin_game(self, game_name: str, env: TextAdventureEnv, state: GameState) -> None:
+        """Install a game returned by load_game() as the active session."""
+        self.clear()
+        self.env = env
         self.game_name = game_name
-        self.current_state = self.env.reset()
         self.started_at = datetime.now()
-        return self.current_state
+        self.started_at_iso = self.started_at.isoformat()
+        self.update_state(state)
+
+    def update_state(self, state: GameState) -> None:
+        """Record a new current state and cache its formatted view."""
+        self.current_state = state
+        self._formatted = _format_state(state)
+        self.derived.clear()
+        self.epoch += 1
+
+    def formatted_state(self) -> dict:
+        """Return a copy of the formatted current state, safe for callers to extend."""
+        return dict(self._formatted or {})
+
+    def get_cached_valid_actions(self) -> Optional[list[str]]:
+        """Return valid actions previously computed for current_state's world hash."""
+        state_hash = self.current_state.state_hash if self.current_state else None
+        if state_hash is None:
+            return None
+        actions = self._valid_actions.get(state_hash)
+        if actions is not None:
+            self._valid_actions.move_to_end(state_hash)
+        return actions
+
+    def cache_valid_actions(self, actions: list[str]) -> None:
+        """Remember the valid actions for current_state's world hash."""
+        state_hash = self.current_state.state_hash if self.current_state else None
+        if state_hash is None:
+            return
+        self._valid_actions[state_hash] = actions
+        self._valid_actions.move_to_end(state_hash)
+        if len(self._valid_actions) > _VALID_ACTIONS_CACHE_SIZE:
+            self._valid_actions.popitem(last=False)
 
     def clear(self):
         self.env = None
         self.game_name = None
         self.current_state = None
         self.started_at = None
+        self.started_at_iso = None
+        self.vocabulary = None
+        self.derived.clear()
+        self._valid_actions.clear()
+        self._formatted = None
+        self.epoch += 1
+
+
+# GameState fields exposed to agents, in response order; state_hash stays internal.
+_STATE_FIELDS = (
+    "observation", "score", "max_score", "moves", "done", "reward", "inventory", "location",
+)
+_get_state_fields = operator.attrgetter(*_STATE_FIELDS)
+
+
+def _pct(score: int, max_score: int) -> int:
+    """Score as a whole percentage of max_score, rounded half up (0 if max_score is 0)."""
+    return ((score * 100 + (max_score >> 1)) // max_score) if max_score else 0
 
 
 def _format_state(state: GameState) -> dict:
     """Format a GameState into a clean, agent-readable dictionary."""
-    result = {
-        "observation": state.observation,
-        "score": state.score,
-        "max_score": state.max_score,
-        "moves": state.moves,
-        "done": state.done,
-        "reward": state.reward,
-        "inventory": state.inventory,
-        "location": state.location,
-    }
+    result = dict(zip(_STATE_FIELDS, _get_state_fields(state)))
 
     # Add a progress summary to help the agent track how well it's doing
     if state.max_score and state.max_score > 0:
-        pct = round((state.score / state.max_score) * 100)
-        result["progress"] = f"{state.score}/{state.max_score} ({pct}%)"
+        result["progress"] = (
+            f"{state.score}/{state.max_score} ({_pct(state.score, state.max_score)}%)"
+        )
     else:
         result["progress"] = f"{state.score} points"
 
-    return result
\ No newline at end of file
+    return result
+
+
+def _classify_vocabulary(vocab: list) -> dict:
+    """Group DictionaryWords by part of speech in a single pass over the dictionary."""
+    verbs, nouns, adjectives, directions = [], [], [], []
+    prepositions, meta, special, unclassified = [], [], [], []
+
+    for w in vocab:
+        word = str(w)
+        classified = False
+        if w.is_verb:
+            verbs.append(word)
+            classified = True
+        if w.is_noun:
+            nouns.append(word)
+            classified = True
+        if w.is_adj:
+            adjectives.append(word)
+            classified = True
+        if w.is_dir:
+            directions.append(word)
+            classified = True
+        if w.is_prep:
+            prepositions.append(word)
+            classified = True
+        if w.is_meta:
+            meta.append(word)
+            classified = True
+        if w.is_special:
+            special.append(word)
+            classified = True
+        if not classified:
+            unclassified.append(word)
+
+    return {
+        "total_words":  len(vocab),
+        "verbs":        verbs,
+        "nouns":        nouns,
+        "adjectives":   adjectives,
+        "directions":   directions,
+        "prepositions": prepositions,
+        "meta":         meta,
+        "special":      special,
+        "unclassified": unclassified,
+    }